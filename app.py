@@ -1,10 +1,9 @@
 import streamlit as st
-import os
 import json
-from src.core.chains import create_intelligent_rag_chain
+from src.core.chains import create_intelligent_rag_chain, retrieve_documents
 from src.utils.ollama_helpers import OllamaProvider
-from src.retrieval.filters import ChromaFilterBuilder
-from langchain_chroma import Chroma
+from src.data_eng.snapshots import IndexSnapshotManager
+from src.core.speculation import SpeculationStats
 from langchain_core.runnables import RunnablePassthrough
 from langchain_core.output_parsers import JsonOutputParser
 from src.core.prompts import get_query_translation_prompt
@@ -54,6 +53,10 @@ with st.sidebar:
     model_choice = st.selectbox("LLM Model", ["llama3.2", "mistral", "phi3"], index=0)
     top_k = st.slider("Retrieval Depth (K)", 1, 10, 5)
     temp = st.slider("Creativity (Temp)", 0.0, 1.0, 0.0, 0.1)
+    recency_weight = st.slider("Recency Weight", 0.0, 1.0, 0.0, 0.1,
+                               help="Favor newer reviews when ranking sources (0 = relevance only)")
+    speculative = st.checkbox("Speculative Retrieval", value=False,
+                              help="Start searching while the query is still being translated")
     
     st.markdown("---")
     st.subheader("🔍 Inspection Mode")
@@ -65,19 +68,35 @@ with st.sidebar:
     st.success("✅ FlashRank: Active")
 
 # --- System Initialization ---
-@st.cache_resource
-def get_vector_store():
-    persist_dir = "data/chroma_db"
-    if not os.path.exists(persist_dir):
-        return None
-        
-    embeddings = OllamaProvider.get_embeddings()
-    return Chroma(
-        persist_directory=persist_dir,
-        embedding_function=embeddings
-    )
-
-vector_store = get_vector_store()
+snapshots = IndexSnapshotManager("data/chroma_db")
+
+@st.cache_resource(max_entries=1)
+def get_index(index_path):
+    # Keyed by snapshot path: publishing a new snapshot creates a new entry and,
+    # with max_entries=1, evicts the vector store and chunk store of the old one.
+    return snapshots.open_index(index_path)
+
+# Per browser session (cache_resource would share it across users), kept across reruns
+if "speculation_stats" not in st.session_state:
+    st.session_state.speculation_stats = SpeculationStats()
+speculation_stats = st.session_state.speculation_stats
+
+index_path = snapshots.current_path()
+if index_path is None:
+    vector_store, chunk_store, compact_index = None, None, None
+else:
+    vector_store, chunk_store, compact_index = get_index(index_path)
+
+with st.sidebar:
+    st.markdown("---")
+    st.subheader("🗂️ Index Snapshot")
+    st.caption(f"Active: {(snapshots.current_version() or 'legacy (unversioned)') if index_path else 'none'}")
+    if st.button("Roll back to previous snapshot"):
+        try:
+            st.toast(f"Rolled back to {snapshots.rollback()}")
+            st.rerun()
+        except ValueError as e:
+            st.warning(str(e))
 
 # --- Chat Interface ---
 if "messages" not in st.session_state:
@@ -124,37 +143,37 @@ if prompt := st.chat_input("Ex: What do people say about the fish at Beyond Flav
                     dynamic_chain = create_intelligent_rag_chain(
                         vector_store, 
                         k=top_k, 
-                        temperature=temp
+                        temperature=temp,
+                        chunk_store=chunk_store,
+                        recency_weight=recency_weight,
+                        compact_index=compact_index,
+                        speculative=speculative,
+                        speculation_stats=speculation_stats
                     )
                     
                     response = dynamic_chain.invoke(prompt)
                     
                     # Display Final Answer
                     st.markdown(response)
+                    if speculative and speculation_stats.last:
+                        outcome = "used" if speculation_stats.last["used"] else "discarded"
+                        st.caption(f"⚡ Speculative results {outcome} "
+                                   f"({speculation_stats.last['saved_seconds']:+.2f}s). {speculation_stats.summary()}")
                     st.session_state.messages.append({"role": "assistant", "content": response})
 
                     # 3. Show Source Documents if requested
                     if show_sources:
                         with st.expander("📚 Source Documents", expanded=False):
-                            from src.retrieval.hybrid_retriever import HybridRetrieverFactory
-                            from langchain.retrievers import ContextualCompressionRetriever
-                            from langchain.retrievers.document_compressors import FlashrankRerank
-                            
-                            chroma_filter = ChromaFilterBuilder.build_filter(translation.get("filters", {}))
-                            hybrid_retriever = HybridRetrieverFactory.create_hybrid_retriever(
-                                vector_store, info_filters=chroma_filter, k=top_k*2
-                            )
-                            compressor = FlashrankRerank(top_n=top_k)
-                            compression_retriever = ContextualCompressionRetriever(
-                                base_compressor=compressor, base_retriever=hybrid_retriever
+                            docs = retrieve_documents(
+                                vector_store, translation, prompt, k=top_k, chunk_store=chunk_store,
+                                recency_weight=recency_weight, compact_index=compact_index
                             )
-                            docs = compression_retriever.invoke(translation.get("clean_query", prompt))
                             
                             for i, doc in enumerate(docs):
                                 st.markdown(f"""
                                 <div class="source-card">
                                     <b>Source #{i+1} - {doc.metadata.get('restaurant', 'Unknown')}</b><br>
-                                    <i>Reviewer: {doc.metadata.get('reviewer', 'Anonymous')} ({doc.metadata.get('rating')} stars)</i><br><br>
+                                    <i>Reviewer: {doc.metadata.get('reviewer', 'Anonymous')} ({doc.metadata.get('rating')} stars) - {doc.metadata.get('time', 'Undated')}</i><br><br>
                                     "{doc.page_content}"
                                 </div>
                                 """, unsafe_allow_html=True)
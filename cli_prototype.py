@@ -1,11 +1,10 @@
 import argparse
 import sys
-import os
 
 from src.data_eng.ingestor import ReviewIngestor
+from src.data_eng.snapshots import IndexSnapshotManager
 from src.core.chains import create_rag_chain, create_intelligent_rag_chain
-from langchain_chroma import Chroma
-from src.utils.ollama_helpers import OllamaProvider
+from src.core.speculation import SpeculationStats
 
 def run_query(rag_chain, query):
     """
@@ -27,34 +26,80 @@ def main():
     parser = argparse.ArgumentParser(description="Restaurant Intelligence System (RIS) CLI")
     parser.add_argument("--ingest", action="store_true", help="Ingest data from CSV to Vector DB")
     parser.add_argument("--query", type=str, help="Single query to the RAG system")
+    parser.add_argument("--rollback", action="store_true", help="Re-publish the previous index snapshot")
+    parser.add_argument("--list-snapshots", action="store_true", help="List stored index snapshots")
+    parser.add_argument("--dedup-threshold", type=float, default=0.9,
+                        help="Near-duplicate similarity threshold for ingestion (0 disables dedup)")
+    parser.add_argument("--compact-dims", type=int, default=None,
+                        help="Store Matryoshka-truncated vectors of this size (e.g. 256) and rescore with full precision")
+    parser.add_argument("--binary", action="store_true",
+                        help="Store binary-quantized codes for a Hamming first pass, rescored with full precision")
+    parser.add_argument("--speculative", action="store_true",
+                        help="Overlap query translation with unfiltered retrieval")
+    parser.add_argument("--recency-weight", type=float, default=0.0,
+                        help="Share of the ranking score given to review recency (0 = relevance only)")
     
     args = parser.parse_args()
     
-    persist_dir = "data/chroma_db"
+    snapshots = IndexSnapshotManager("data/chroma_db")
     
     # Data Ingestion Routine
     if args.ingest:
-        print("Starting ingestion...")
-        ingestor = ReviewIngestor(persist_directory=persist_dir)
-        ingestor.ingest("data/raw/Restaurant reviews.csv")
-        print("Ingestion complete.")
+        print("Starting ingestion into a new index snapshot...")
+        dedup_threshold = args.dedup_threshold if args.dedup_threshold > 0 else None
+        
+        def build(path):
+            ingestor = ReviewIngestor(
+                persist_directory=path, dedup_threshold=dedup_threshold,
+                compact_dims=args.compact_dims, binary=args.binary
+            )
+            ingestor.ingest("data/raw/Restaurant reviews.csv")
+        
+        # The build writes into a new version next to whatever snapshot is currently being
+        # served; running apps switch over only after validation and the atomic publish.
+        # Failures propagate (with traceback and a non-zero exit status).
+        version = snapshots.build(build)
+        print(f"Ingestion complete. Published snapshot {version}.")
+        return
+
+    if args.list_snapshots:
+        current = snapshots.current_version()
+        for version in snapshots.list_versions():
+            status = "" if snapshots.is_complete(version) else " (incomplete)"
+            print(f"{'*' if version == current else ' '} {version}{status}")
+        return
+
+    if args.rollback:
+        try:
+            print(f"Rolled back to snapshot {snapshots.rollback()}.")
+        except ValueError as e:
+            print(e)
         return
 
     # Check for existing vector store before querying
-    if not os.path.exists(persist_dir):
+    if snapshots.current_path() is None:
         print("Vector store not found. Please run with --ingest first.")
         return
 
     # Initialization of system components
     print("Loading Restaurant Intelligence System...")
-    embeddings = OllamaProvider.get_embeddings()
-    vector_store = Chroma(
-        persist_directory=persist_dir,
-        embedding_function=embeddings
-    )
-    # Configure retriever (k=5 for balance between context richness and LLM context window)
-    # We now pass the vector_store to the intelligent chain which handles retrieval internally
-    rag_chain = create_intelligent_rag_chain(vector_store)
+    speculation_stats = SpeculationStats() if args.speculative else None
+    
+    def load_chain():
+        """
+        Opens the published snapshot and builds the RAG chain on top of it.
+        """
+        index_path = snapshots.current_path()
+        vector_store, chunk_store, compact_index = snapshots.open_index(index_path)
+        # We now pass the vector_store to the intelligent chain which handles retrieval internally
+        chain = create_intelligent_rag_chain(
+            vector_store, chunk_store=chunk_store, recency_weight=args.recency_weight,
+            compact_index=compact_index, speculative=args.speculative,
+            speculation_stats=speculation_stats
+        )
+        return index_path, chain
+    
+    index_path, rag_chain = load_chain()
 
     # Mode selection: Single Query vs Interactive
     if args.query:
@@ -77,12 +122,20 @@ def main():
                 if not user_input:
                     continue
                 
+                # Pick up a newly published snapshot without restarting
+                if snapshots.current_path() != index_path:
+                    index_path, rag_chain = load_chain()
+                    print(f"(Switched to index snapshot {snapshots.current_version()})")
+                
                 run_query(rag_chain, user_input)
                 print("\n(Type 'q' to quit)")
             except KeyboardInterrupt:
                 # Handle Ctrl+C gracefully
                 print("\nExiting...")
                 break
+    
+    if speculation_stats is not None:
+        print(speculation_stats.summary())
 
 if __name__ == "__main__":
     main()
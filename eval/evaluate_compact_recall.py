@@ -0,0 +1,137 @@
+import argparse
+import json
+import numpy as np
+import pandas as pd
+from src.data_eng.snapshots import IndexSnapshotManager
+from src.retrieval.compact_index import CompactIndex
+from src.utils.ollama_helpers import OllamaProvider
+
+K = 10
+RESCORE_FACTOR = 4
+SYNTHETIC_QUERIES = 200
+TRUNCATION_DIMS = [None, 512, 256]
+
+def load_full_vectors(vector_store, chunk_store, compact_index) -> np.ndarray:
+    """
+    Returns full-precision chunk vectors in ChunkStore row order.
+    Compact snapshots keep them on disk; full-precision snapshots are read back from Chroma.
+    """
+    if compact_index is not None:
+        return np.asarray(compact_index.full, dtype=np.float32)
+    data = vector_store._collection.get(include=["embeddings"])
+    vectors = np.empty((len(chunk_store), len(data["embeddings"][0])), dtype=np.float32)
+    vectors[chunk_store.positions(data["ids"])] = np.asarray(data["embeddings"], dtype=np.float32)
+    return CompactIndex.normalize(vectors)
+
+def synthetic_queries(full: np.ndarray, n: int, seed: int = 7) -> np.ndarray:
+    """
+    Uses the stored vectors of randomly sampled chunks as queries ("find reviews like this one"),
+    so no new query embeddings are needed.
+    """
+    rng = np.random.default_rng(seed)
+    rows = rng.choice(len(full), size=min(n, len(full)), replace=False)
+    return full[rows]
+
+def top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """
+    Row-wise indices of the k largest scores, best first.
+    """
+    best = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    order = np.take_along_axis(scores, best, axis=1).argsort(axis=1)[:, ::-1]
+    return np.take_along_axis(best, order, axis=1)
+
+def hnsw_top_k(vector_store, chunk_store, queries: np.ndarray, k: int) -> np.ndarray:
+    """
+    Top-k row positions from the snapshot's Chroma HNSW index, i.e. the current full-precision setup.
+    """
+    result = vector_store._collection.query(query_embeddings=queries.tolist(), n_results=k, include=["distances"])
+    return np.asarray([chunk_store.positions(ids) for ids in result["ids"]])
+
+def rescore(full: np.ndarray, queries: np.ndarray, shortlists: np.ndarray, k: int) -> np.ndarray:
+    """
+    Re-ranks each query's shortlist by full-precision similarity.
+    """
+    scores = np.einsum("qsd,qd->qs", full[shortlists], queries)
+    return np.take_along_axis(shortlists, top_k(scores, k), axis=1)
+
+def recall(approx: np.ndarray, reference: np.ndarray) -> float:
+    return float(np.mean([len(set(a) & set(r)) / len(r) for a, r in zip(approx, reference)]))
+
+def evaluate(full: np.ndarray, queries: np.ndarray, k: int = K, hnsw: np.ndarray = None):
+    """
+    Compares truncated and binary first passes, with and without full-precision rescoring,
+    against exact full-precision search and, if given, the HNSW top-k of the current setup.
+    Compact first passes are brute force, so the numbers isolate the effect of compression.
+    """
+    exact = top_k(queries @ full.T, k)
+    shortlist = k * RESCORE_FACTOR
+    full_bytes = full.shape[1] * 4
+
+    def row(method, dims, bytes_per_vector, result):
+        return {
+            "method": method, "dims": dims, "bytes_per_vector": bytes_per_vector,
+            f"recall@{k}_vs_exact": recall(result, exact),
+            f"recall@{k}_vs_hnsw": recall(result, hnsw) if hnsw is not None else np.nan,
+        }
+
+    rows = [row("exact", full.shape[1], full_bytes, exact)]
+    if hnsw is not None:
+        rows.append(row("hnsw (current setup)", full.shape[1], full_bytes, hnsw))
+    for dims in TRUNCATION_DIMS:
+        label = dims or full.shape[1]
+        doc_vectors = CompactIndex.truncate(full, dims)
+        query_vectors = CompactIndex.truncate(queries, dims)
+        if dims is not None:
+            first = top_k(query_vectors @ doc_vectors.T, shortlist)
+            rows.append(row("truncated", label, label * 4, first[:, :k]))
+            rows.append(row("truncated+rescore", label, label * 4, rescore(full, queries, first, k)))
+
+        # Hamming similarity = dims - distance, so top-k of the +/-1 dot product
+        bits = np.unpackbits(CompactIndex.quantize(doc_vectors), axis=1).astype(np.int16) * 2 - 1
+        query_bits = np.unpackbits(CompactIndex.quantize(query_vectors), axis=1).astype(np.int16) * 2 - 1
+        first = top_k(query_bits @ bits.T, shortlist)
+        rows.append(row("binary", label, label // 8, first[:, :k]))
+        rows.append(row("binary+rescore", label, label // 8, rescore(full, queries, first, k)))
+    return rows
+
+def main():
+    parser = argparse.ArgumentParser(description="Recall@k of compact embeddings versus full precision")
+    parser.add_argument("--snapshot", type=str, help="Snapshot directory (defaults to the published one)")
+    parser.add_argument("--synthetic-only", action="store_true",
+                        help="Skip eval/test_set.json, which needs the embedding model for its queries")
+    parser.add_argument("--output", type=str, default="eval/compact_recall_report.csv")
+    args = parser.parse_args()
+
+    print("Initializing Compact Embedding Recall Evaluation...")
+    snapshots = IndexSnapshotManager("data/chroma_db")
+    path = args.snapshot or snapshots.current_path()
+    vector_store, chunk_store, compact_index = snapshots.open_index(path)
+    full = load_full_vectors(vector_store, chunk_store, compact_index)
+    if compact_index is not None:
+        # Chroma holds compact vectors here, so it can't serve as the full-precision baseline.
+        print("Snapshot is compact; the HNSW baseline needs a full-precision snapshot (--snapshot).")
+
+    query_sets = {"synthetic": synthetic_queries(full, SYNTHETIC_QUERIES)}
+    if not args.synthetic_only:
+        with open("eval/test_set.json", "r") as f:
+            questions = [item["question"] for item in json.load(f)]
+        embeddings = OllamaProvider.get_embeddings()
+        query_sets["test_set"] = CompactIndex.normalize(
+            np.asarray(embeddings.embed_documents(questions), dtype=np.float32)
+        )
+
+    results = []
+    for name, queries in query_sets.items():
+        print(f"Evaluating {len(queries)} queries from {name}...")
+        hnsw = hnsw_top_k(vector_store, chunk_store, queries, K) if compact_index is None else None
+        for row in evaluate(full, queries, hnsw=hnsw):
+            results.append({"query_set": name, "queries": len(queries), **row})
+
+    df = pd.DataFrame(results)
+    print("\nRecall versus full-precision search:")
+    print(df.to_string(index=False, float_format="%.3f"))
+    df.to_csv(args.output, index=False)
+    print(f"\nReport saved to {args.output}")
+
+if __name__ == "__main__":
+    main()
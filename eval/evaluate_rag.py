@@ -5,24 +5,19 @@ from datasets import Dataset
 from ragas import evaluate
 from ragas.metrics import faithfulness, answer_relevancy, context_precision
 from src.core.chains import create_intelligent_rag_chain
-from src.utils.ollama_helpers import OllamaProvider
-from langchain_chroma import Chroma
+from src.data_eng.snapshots import IndexSnapshotManager
 from langchain_ollama import ChatOllama
 
 def main():
     print("Initializing Evaluation System...")
     
     # 1. Load Vector Store
-    persist_dir = "data/chroma_db"
-    embeddings = OllamaProvider.get_embeddings()
-    vector_store = Chroma(
-        persist_directory=persist_dir,
-        embedding_function=embeddings
-    )
+    snapshots = IndexSnapshotManager("data/chroma_db")
+    vector_store, chunk_store, compact_index = snapshots.open_index(snapshots.current_path())
     
     # 2. Initialize RAG Chain
     # Note: Phase 3 chain includes Hybrid Search + Reranking
-    rag_chain = create_intelligent_rag_chain(vector_store)
+    rag_chain = create_intelligent_rag_chain(vector_store, chunk_store=chunk_store, compact_index=compact_index)
     
     # 3. Load Test Set
     with open("eval/test_set.json", "r") as f:
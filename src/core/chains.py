@@ -4,7 +4,10 @@ from src.core.prompts import get_rag_prompt, get_query_translation_prompt
 from src.utils.ollama_helpers import OllamaProvider
 from src.retrieval.filters import ChromaFilterBuilder
 from src.retrieval.hybrid_retriever import HybridRetrieverFactory
-from langchain.retrievers import ContextualCompressionRetriever
+from src.retrieval.recency import RecencyScorer
+from src.core.speculation import SpeculationStats
+from concurrent.futures import ThreadPoolExecutor
+import time
 from langchain.retrievers.document_compressors import FlashrankRerank
 
 def format_docs(docs):
@@ -38,14 +41,85 @@ def create_rag_chain(retriever):
     
     return rag_chain
 
-def create_intelligent_rag_chain(vector_store, k: int = 5, temperature: float = 0):
+def retrieve_documents(vector_store, translation: dict, question: str, k: int = 5, chunk_store=None,
+                       recency_weight: float = 0.0, recency_half_life_days: float = 180, compact_index=None):
+    """
+    Runs filtered hybrid retrieval and reranking for a translated question.
+    
+    Args:
+        vector_store: ChromaDB instance.
+        translation: Output of the translator chain ({"filters": ..., "clean_query": ...}).
+        question: Original question, used if the translation has no clean query.
+        k: Number of documents to return after reranking.
+        chunk_store: Optional ChunkStore for texts and metadata.
+        recency_weight: Share of the final score given to review recency (0 disables it).
+        recency_half_life_days: Age at which a review's recency score halves.
+        compact_index: Optional CompactIndex for truncated/binary first-pass vector search.
+    """
+    clean_query = translation.get("clean_query", question)
+    filters_raw = translation.get("filters", {})
+    
+    # Convert simple filters to ChromaDB format
+    chroma_filter = ChromaFilterBuilder.build_filter(filters_raw)
+    
+    # Create Hybrid Retriever with dynamic filters
+    hybrid_retriever = HybridRetrieverFactory.create_hybrid_retriever(
+        vector_store, info_filters=chroma_filter, k=k*2, # Retrieve more for reranking
+        chunk_store=chunk_store, compact_index=compact_index
+    )
+    
+    # Perform retrieval and reranking
+    docs = hybrid_retriever.invoke(clean_query)
+    return rerank_documents(
+        docs, clean_query, k=k, chunk_store=chunk_store,
+        recency_weight=recency_weight, recency_half_life_days=recency_half_life_days
+    )
+
+def rerank_documents(docs, query: str, k: int = 5, chunk_store=None,
+                     recency_weight: float = 0.0, recency_half_life_days: float = 180):
+    """
+    Reranks retrieved candidates with FlashRank and optional recency weighting, keeping the top k.
+    """
+    if not docs:
+        return []
+    
+    # Initialize Reranker (FlashRank). With recency weighting, keep a wider
+    # shortlist so recent reviews just outside the top-k can move up.
+    top_n = k*2 if recency_weight > 0 else k
+    compressor = FlashrankRerank(top_n=top_n)
+    docs = list(compressor.compress_documents(docs, query))
+    
+    if recency_weight > 0:
+        reference_ts = RecencyScorer.reference_timestamp(chunk_store=chunk_store, docs=docs)
+        docs = RecencyScorer.rerank(docs, recency_weight, recency_half_life_days, reference_ts)[:k]
+    
+    return docs
+
+def create_intelligent_rag_chain(vector_store, k: int = 5, temperature: float = 0, chunk_store=None,
+                                 recency_weight: float = 0.0, recency_half_life_days: float = 180,
+                                 compact_index=None, speculative: bool = False,
+                                 speculation_stats: SpeculationStats = None, overfetch: int = 4):
     """
     Creates an advanced RAG chain that performs query translation for intelligent filtering.
     
+    In speculative mode, an unfiltered, over-fetched hybrid search on the raw question runs
+    while the translator LLM is still producing filters. Once the filters arrive, the
+    speculative candidates are filtered in memory; a filtered search only runs when too
+    few candidates survive.
+    
     Args:
         vector_store: ChromaDB instance.
         k: Number of documents to retrieve before reranking.
         temperature: LLM creativity setting.
+        chunk_store: Optional ChunkStore; when given, texts and metadata are read from it
+            and ChromaDB is only used for vector similarity.
+        recency_weight: Share of the ranking score given to review recency (0 disables it).
+        recency_half_life_days: Age at which a review's recency score halves.
+        compact_index: Optional CompactIndex for truncated/binary first-pass vector search.
+        speculative: Overlap query translation with unfiltered retrieval.
+        speculation_stats: Optional SpeculationStats collecting hit rate and latency saved.
+        overfetch: Multiplier on the candidate count for the speculative search,
+            so enough candidates survive the filters.
     """
     llm = OllamaProvider.get_llm(temperature=temperature)
     translator_prompt = get_query_translation_prompt()
@@ -60,34 +134,77 @@ def create_intelligent_rag_chain(vector_store, k: int = 5, temperature: float =
         """
         translation = input_data["translation"]
         clean_query = translation.get("clean_query", input_data["question"])
-        filters_raw = translation.get("filters", {})
-        
-        # Convert simple filters to ChromaDB format
-        chroma_filter = ChromaFilterBuilder.build_filter(filters_raw)
         
-        # 3. Create Hybrid Retriever with dynamic filters
-        hybrid_retriever = HybridRetrieverFactory.create_hybrid_retriever(
-            vector_store, info_filters=chroma_filter, k=k*2 # Retrieve more for reranking
+        docs = retrieve_documents(
+            vector_store, translation, input_data["question"], k=k, chunk_store=chunk_store,
+            recency_weight=recency_weight, recency_half_life_days=recency_half_life_days,
+            compact_index=compact_index
         )
         
-        # 4. Initialize Reranker (FlashRank)
-        compressor = FlashrankRerank(top_n=k)
-        compression_retriever = ContextualCompressionRetriever(
-            base_compressor=compressor, base_retriever=hybrid_retriever
-        )
+        return {"context": format_docs(docs), "question": clean_query}
+
+    def timed(fn, *args):
+        start = time.perf_counter()
+        result = fn(*args)
+        return result, time.perf_counter() - start
+    
+    def hybrid_search(query, info_filters, n):
+        return HybridRetrieverFactory.create_hybrid_retriever(
+            vector_store, info_filters=info_filters, k=n,
+            chunk_store=chunk_store, compact_index=compact_index
+        ).invoke(query)
+    
+    def speculative_retrieval(question):
+        """
+        Runs translation and an unfiltered hybrid search concurrently, then filters in place.
+        """
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            translation_future = executor.submit(timed, translator_chain.invoke, question)
+            speculative_future = executor.submit(timed, hybrid_search, question, None, k*2*overfetch)
+            translation, translation_time = translation_future.result()
+            candidates, speculative_time = speculative_future.result()
         
-        # Perform retrieval and reranking
-        docs = compression_retriever.invoke(clean_query)
+        clean_query = translation.get("clean_query", question)
+        chroma_filter = ChromaFilterBuilder.build_filter(translation.get("filters", {}))
+        survivors = [doc for doc in candidates if ChromaFilterBuilder.matches(doc.metadata, chroma_filter)]
         
+        # Use the speculative candidates if enough survive for reranking (same budget
+        # as the regular path: k*2 per retriever); otherwise fall back to a filtered search.
+        used = len(survivors) >= k*2
+        if used:
+            docs, retrieval_time = survivors[:k*4], speculative_time
+        else:
+            docs, retrieval_time = timed(hybrid_search, clean_query, chroma_filter, k*2)
+        
+        if speculation_stats is not None:
+            # Without speculation, translation and retrieval would have run back to back.
+            speculation_stats.record(
+                used, sequential_seconds=translation_time + retrieval_time,
+                actual_seconds=time.perf_counter() - start
+            )
+        
+        docs = rerank_documents(
+            docs, clean_query, k=k, chunk_store=chunk_store,
+            recency_weight=recency_weight, recency_half_life_days=recency_half_life_days
+        )
         return {"context": format_docs(docs), "question": clean_query}
 
     # 2. Complete Chain
-    full_chain = (
-        {"translation": translator_chain, "question": RunnablePassthrough()}
-        | RunnableLambda(intelligent_retrieval)
-        | rag_prompt
-        | llm
-        | StrOutputParser()
-    )
+    if speculative:
+        full_chain = (
+            RunnableLambda(speculative_retrieval)
+            | rag_prompt
+            | llm
+            | StrOutputParser()
+        )
+    else:
+        full_chain = (
+            {"translation": translator_chain, "question": RunnablePassthrough()}
+            | RunnableLambda(intelligent_retrieval)
+            | rag_prompt
+            | llm
+            | StrOutputParser()
+        )
     
     return full_chain
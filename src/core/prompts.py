@@ -28,8 +28,12 @@ Metadata fields available:
 - restaurant (string): The name of the restaurant.
 - rating (float): The star rating of the review (1.0 to 5.0).
 - has_timestamp (boolean): Whether the review has a valid timestamp.
+- year (integer): The year the review was posted (e.g. 2019).
+- month (integer): The month the review was posted (1 to 12).
+- date_range (object): Special filter with optional "from" and "to" keys as YYYY-MM-DD dates (both inclusive).
 
 Operators available: $eq, $ne, $gt, $gte, $lt, $lte.
+Only use date_range, year or month when the question names an explicit date or period. Do not guess dates for words like "recent".
 
 Return ONLY a JSON object with two keys:
 1. "filters": A dictionary of metadata filters. Use the operators above if needed.
@@ -46,6 +50,16 @@ Response: {{
 }}
 
 Example 2:
+Question: "How was the service at Beyond Flavours between January and March 2019?"
+Response: {{
+    "filters": {{
+        "restaurant": "Beyond Flavours",
+        "date_range": {{"from": "2019-01-01", "to": "2019-03-31"}}
+    }},
+    "clean_query": "How was the service?"
+}}
+
+Example 3:
 Question: "General sentiment about food quality?"
 Response: {{
     "filters": {{}},
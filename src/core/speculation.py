@@ -0,0 +1,52 @@
+import threading
+
+class SpeculationStats:
+    """
+    Thread-safe counters for speculative retrieval: how often the speculative
+    (unfiltered) candidates were used and how much end-to-end latency that saved.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.queries = 0
+        self.hits = 0
+        self.sequential_seconds = 0.0
+        self.actual_seconds = 0.0
+        self.last = None
+
+    def record(self, used: bool, sequential_seconds: float, actual_seconds: float):
+        """
+        Records one query.
+
+        Args:
+            used: Whether the speculative candidates were used (no filtered search needed).
+            sequential_seconds: Estimated translation + retrieval time without speculation.
+            actual_seconds: Measured time from question to retrieval results with speculation.
+        """
+        with self._lock:
+            self.queries += 1
+            self.hits += int(used)
+            self.sequential_seconds += sequential_seconds
+            self.actual_seconds += actual_seconds
+            self.last = {
+                "used": used,
+                "saved_seconds": sequential_seconds - actual_seconds,
+            }
+
+    @property
+    def hit_rate(self) -> float:
+        return self.hits / self.queries if self.queries else 0.0
+
+    @property
+    def saved_seconds(self) -> float:
+        """
+        Total latency saved; negative if misses cost more than hits saved.
+        """
+        return self.sequential_seconds - self.actual_seconds
+
+    def summary(self) -> str:
+        if not self.queries:
+            return "No speculative queries yet."
+        return (
+            f"Speculative results used for {self.hits}/{self.queries} queries ({self.hit_rate:.0%}); "
+            f"saved {self.saved_seconds:.2f}s in total ({self.saved_seconds / self.queries:.2f}s per query)."
+        )
@@ -0,0 +1,201 @@
+import os
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+from langchain_core.documents import Document
+
+class ChunkStore:
+    """
+    Columnar store for chunk texts and metadata, keyed by chunk ID.
+    Written once at ingestion time as an uncompressed Arrow IPC file and memory-mapped on open,
+    so lookups and scans operate on Arrow buffers instead of Python lists of dicts.
+    ChromaDB is only needed for vector similarity; everything else is read from here.
+    """
+    FILE_NAME = "chunks.arrow"
+    ID_COLUMN = "chunk_id"
+    TEXT_COLUMN = "text"
+
+    # Maps ChromaDB comparison operators to Arrow compute kernels.
+    _OPERATORS = {
+        "$eq": pc.equal,
+        "$ne": pc.not_equal,
+        "$gt": pc.greater,
+        "$gte": pc.greater_equal,
+        "$lt": pc.less,
+        "$lte": pc.less_equal,
+    }
+
+    # Raised by compute kernels when a filter operand doesn't match the column type,
+    # e.g. {"year": "2019"} against an integer column.
+    _TYPE_ERRORS = (pa.ArrowNotImplementedError, pa.ArrowInvalid, pa.ArrowTypeError)
+
+    def __init__(self, table: pa.Table):
+        self.table = table
+        # ID -> row position, built once so lookups don't rehash the whole ID column.
+        self._row_index = {
+            chunk_id: row for row, chunk_id in enumerate(table[self.ID_COLUMN].to_pylist())
+        }
+
+    def __len__(self) -> int:
+        return self.table.num_rows
+
+    @classmethod
+    def write(cls, directory: str, ids: Sequence[str], documents: Sequence[Document]) -> "ChunkStore":
+        """
+        Builds the columnar store from chunk documents and persists it next to the vector index.
+
+        Args:
+            directory: Folder to write the Arrow file into (usually the ChromaDB persist directory).
+            ids: Chunk IDs, in the same order as documents (and as stored in ChromaDB).
+            documents: Chunk documents whose metadata becomes one column per key.
+        """
+        columns: Dict[str, List[Any]] = {
+            cls.ID_COLUMN: list(ids),
+            cls.TEXT_COLUMN: [doc.page_content for doc in documents],
+        }
+        # One column per metadata key; keys missing on a chunk become nulls.
+        keys = list(dict.fromkeys(key for doc in documents for key in doc.metadata))
+        for key in keys:
+            columns[key] = [doc.metadata.get(key) for doc in documents]
+
+        table = pa.table(columns)
+        os.makedirs(directory, exist_ok=True)
+        with pa.OSFile(os.path.join(directory, cls.FILE_NAME), "wb") as sink:
+            # No compression, so the file can be memory-mapped without decoding.
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        return cls(table)
+
+    @classmethod
+    def open(cls, directory: str) -> Optional["ChunkStore"]:
+        """
+        Memory-maps the chunk store in the given directory.
+        Returns None if the directory was ingested before the chunk store existed.
+        """
+        path = os.path.join(directory, cls.FILE_NAME)
+        if not os.path.exists(path):
+            return None
+        source = pa.memory_map(path, "r")
+        return cls(pa.ipc.open_file(source).read_all())
+
+    def positions(self, ids: Sequence[str]) -> np.ndarray:
+        """
+        Returns the row positions of the given chunk IDs, preserving the order of `ids`.
+        Unknown IDs are dropped. Row positions line up with the rows of any per-chunk
+        array written at ingestion time (e.g. stored embeddings).
+        """
+        rows = [self._row_index[chunk_id] for chunk_id in ids if chunk_id in self._row_index]
+        return np.asarray(rows, dtype=np.int64)
+
+    def positions_where(self, where: Optional[Dict[str, Any]] = None) -> np.ndarray:
+        """
+        Returns the row positions matching a ChromaDB-style `where` filter.
+        """
+        if not where:
+            return np.arange(self.table.num_rows)
+        mask = self._mask(where)
+        # Nulls (missing metadata) never match, as in Chroma.
+        return np.flatnonzero(pc.fill_null(mask, False).to_numpy(zero_copy_only=False))
+
+    def take(self, ids: Sequence[str], columns: Optional[List[str]] = None) -> pa.Table:
+        """
+        Returns the rows for the given chunk IDs, preserving the order of `ids`.
+        Unknown IDs are dropped.
+        """
+        table = self.table.select(columns) if columns else self.table
+        return table.take(self.positions(ids))
+
+    def scan(self, where: Optional[Dict[str, Any]] = None, columns: Optional[List[str]] = None) -> pa.Table:
+        """
+        Vectorized scan over the store using a ChromaDB-style `where` filter.
+
+        Args:
+            where: Filter such as {"$and": [{"restaurant": {"$eq": "X"}}, {"rating": {"$gte": 4}}]}.
+            columns: Optional projection; all columns are returned by default.
+        """
+        table = self.table
+        if where:
+            table = table.filter(self._mask(where))
+        if columns:
+            table = table.select(columns)
+        return table
+
+    def documents(self, where: Optional[Dict[str, Any]] = None) -> List[Document]:
+        """
+        Materializes the chunks matching `where` as LangChain Documents (e.g. for BM25).
+        """
+        return self.to_documents(self.scan(where))
+
+    def get_documents(self, ids: Sequence[str]) -> List[Document]:
+        """
+        Materializes the chunks for the given IDs as LangChain Documents, in ID order.
+        """
+        return self.to_documents(self.take(ids))
+
+    def get_documents_at(self, positions: Sequence[int]) -> List[Document]:
+        """
+        Materializes the chunks at the given row positions, in the given order.
+        """
+        return self.to_documents(self.table.take(pa.array(positions, type=pa.int64())))
+
+    @classmethod
+    def to_documents(cls, table: pa.Table) -> List[Document]:
+        """
+        Converts Arrow rows to Documents, dropping null metadata values.
+        """
+        documents = []
+        for row in table.to_pylist():
+            chunk_id = row.pop(cls.ID_COLUMN, None)
+            text = row.pop(cls.TEXT_COLUMN, "")
+            metadata = {key: value for key, value in row.items() if value is not None}
+            documents.append(Document(id=chunk_id, page_content=text, metadata=metadata))
+        return documents
+
+    def _mask(self, where: Dict[str, Any]) -> pa.ChunkedArray:
+        """
+        Recursively translates a ChromaDB filter into a boolean mask over the table.
+        """
+        masks = []
+        for key, value in where.items():
+            if key == "$and":
+                masks.append(self._combine([self._mask(clause) for clause in value], pc.and_kleene))
+            elif key == "$or":
+                masks.append(self._combine([self._mask(clause) for clause in value], pc.or_kleene))
+            elif key not in self.table.column_names:
+                # Chroma never matches a missing metadata key, so neither do we.
+                masks.append(pa.chunked_array([pa.repeat(False, self.table.num_rows)]))
+            else:
+                column = self.table[key]
+                conditions = value if isinstance(value, dict) else {"$eq": value}
+                for op, operand in conditions.items():
+                    masks.append(self._compare(column, op, operand))
+        return self._combine(masks, pc.and_kleene)
+
+    def _compare(self, column: pa.ChunkedArray, op: str, operand: Any) -> Any:
+        """
+        Evaluates one operator clause. A type mismatch between operand and column
+        (common in LLM-generated filters) matches nothing, or every non-null row for
+        $ne/$nin, in line with ChromaFilterBuilder.matches.
+        """
+        try:
+            if op == "$in":
+                return pc.is_in(column, value_set=pa.array(operand))
+            if op == "$nin":
+                return pc.invert(pc.is_in(column, value_set=pa.array(operand)))
+            if op in self._OPERATORS:
+                return self._OPERATORS[op](column, operand)
+        except self._TYPE_ERRORS:
+            if op in ("$ne", "$nin"):
+                return pc.is_valid(column)
+            return pa.chunked_array([pa.repeat(False, self.table.num_rows)])
+        raise ValueError(f"Unsupported filter operator: {op}")
+
+    def _combine(self, masks: List[Any], combiner) -> Any:
+        if not masks:
+            return pa.chunked_array([pa.repeat(True, self.table.num_rows)])
+        mask = masks[0]
+        for other in masks[1:]:
+            mask = combiner(mask, other)
+        return mask
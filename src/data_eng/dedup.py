@@ -0,0 +1,118 @@
+import re
+import zlib
+from collections import defaultdict
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+class NearDuplicateDetector:
+    """
+    Finds near-duplicate texts with MinHash signatures and LSH banding.
+    Texts are shingled into character n-grams, so short boilerplate reviews
+    ("good food", "Good food!!") are caught as well as long copy-pasted ones.
+    """
+    _PRIME = (1 << 31) - 1  # Mersenne prime keeps a * x + b within uint64
+
+    def __init__(self, threshold: float = 0.9, num_perm: int = 128, shingle_size: int = 5, seed: int = 42):
+        """
+        Args:
+            threshold: Estimated Jaccard similarity at or above which two texts are duplicates.
+            num_perm: Number of MinHash permutations (signature length).
+            shingle_size: Character n-gram size used for shingling.
+            seed: Seed for the permutation coefficients, so runs are reproducible.
+        """
+        if not 0.0 < threshold <= 1.0:
+            raise ValueError("threshold must be in (0, 1]")
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self.bands, self.rows = self._optimal_bands(num_perm, threshold)
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, self._PRIME, size=num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, self._PRIME, size=num_perm, dtype=np.uint64)
+
+    @staticmethod
+    def _optimal_bands(num_perm: int, threshold: float) -> Tuple[int, int]:
+        """
+        Picks the (bands, rows) split whose LSH S-curve midpoint (1/b)^(1/r) is closest to the threshold.
+        """
+        candidates = [(b, num_perm // b) for b in range(1, num_perm + 1) if num_perm % b == 0]
+        return min(candidates, key=lambda br: abs((1.0 / br[0]) ** (1.0 / br[1]) - threshold))
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        """
+        Lowercases and collapses punctuation/whitespace so trivial edits don't defeat matching.
+        """
+        return " ".join(re.sub(r"[^\w\s]", " ", text.lower()).split())
+
+    def _shingles(self, text: str) -> np.ndarray:
+        n = self.shingle_size
+        grams = {text[i:i + n] for i in range(max(len(text) - n + 1, 1))}
+        return np.fromiter((zlib.crc32(g.encode("utf-8")) for g in grams), dtype=np.uint64, count=len(grams))
+
+    def signatures(self, texts: Sequence[str]) -> np.ndarray:
+        """
+        Computes a (len(texts), num_perm) MinHash signature matrix.
+        Each text's permutations are evaluated in one vectorized pass over its shingles.
+        """
+        signatures = np.empty((len(texts), self.num_perm), dtype=np.uint64)
+        for i, text in enumerate(texts):
+            hashes = self._shingles(text) % self._PRIME
+            permuted = (np.outer(hashes, self._a) + self._b) % self._PRIME
+            signatures[i] = permuted.min(axis=0)
+        return signatures
+
+    def find_groups(self, texts: Sequence[str]) -> List[List[int]]:
+        """
+        Groups indices of near-duplicate texts. Every index appears in exactly one group,
+        groups are ordered by their first index and each group lists indices in ascending order,
+        so the first member can serve as the canonical entry. Empty texts are never grouped.
+        """
+        normalized = [self.normalize(text) for text in texts]
+        indices = [i for i, text in enumerate(normalized) if text]
+        parent = list(range(len(texts)))
+
+        def find(i: int) -> int:
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        def union(i: int, j: int) -> None:
+            ri, rj = find(i), find(j)
+            if ri != rj:
+                parent[max(ri, rj)] = min(ri, rj)
+
+        # Exact duplicates after normalization are merged directly.
+        first_seen: Dict[str, int] = {}
+        unique = []
+        for i in indices:
+            if normalized[i] in first_seen:
+                union(first_seen[normalized[i]], i)
+            else:
+                first_seen[normalized[i]] = i
+                unique.append(i)
+
+        if unique:
+            signatures = self.signatures([normalized[i] for i in unique])
+            # LSH: texts sharing any identical band become candidate pairs.
+            for band in range(self.bands):
+                buckets = defaultdict(list)
+                block = signatures[:, band * self.rows:(band + 1) * self.rows]
+                for row, key in enumerate(map(bytes, block)):
+                    buckets[key].append(row)
+                for rows in buckets.values():
+                    if len(rows) < 2:
+                        continue
+                    # Verify candidates with the full-signature similarity estimate.
+                    members = signatures[rows]
+                    for x in range(len(rows) - 1):
+                        similarity = (members[x + 1:] == members[x]).mean(axis=1)
+                        for y in np.nonzero(similarity >= self.threshold)[0]:
+                            union(unique[rows[x]], unique[rows[x + 1 + y]])
+
+        groups: Dict[int, List[int]] = defaultdict(list)
+        for i in range(len(texts)):
+            groups[find(i)].append(i)
+        return sorted(groups.values(), key=lambda group: group[0])
@@ -2,7 +2,13 @@ from langchain_text_splitters import RecursiveCharacterTextSplitter
 from langchain_chroma import Chroma
 from langchain_ollama import OllamaEmbeddings
 from src.data_eng.loader import ReviewDataLoader
+from src.data_eng.chunk_store import ChunkStore
+from src.data_eng.dedup import NearDuplicateDetector
+from src.retrieval.compact_index import CompactIndex
+from src.retrieval.filters import ChromaFilterBuilder
 from langchain_core.documents import Document
+from typing import List, Optional
+import numpy as np
 import os
 
 class ReviewIngestor:
@@ -10,15 +16,28 @@ class ReviewIngestor:
     Handles the ingestion process: loading data, chunking text, and storing in a vector database.
     Designed to be scalable and maintainable for local RAG environments.
     """
-    def __init__(self, persist_directory: str, embedding_model: str = "mxbai-embed-large"):
+    # Stay below ChromaDB's maximum batch size when adding precomputed embeddings
+    ADD_BATCH_SIZE = 5000
+
+    def __init__(self, persist_directory: str, embedding_model: str = "mxbai-embed-large",
+                 dedup_threshold: Optional[float] = 0.9, compact_dims: Optional[int] = None,
+                 binary: bool = False):
         """
         Initializes the ingestor with a persistence directory and embedding model.
         
         Args:
             persist_directory: Folder path for ChromaDB storage.
             embedding_model: Name of the Ollama embedding model to use.
+            dedup_threshold: Estimated Jaccard similarity above which reviews are treated
+                as near-duplicates and collapsed into one canonical document. None disables dedup.
+            compact_dims: Matryoshka truncation size for the vectors stored in ChromaDB (e.g. 256).
+            binary: Also store binary-quantized codes for a Hamming-distance first pass.
+                With either compact option, full-precision vectors are kept on disk for rescoring.
         """
         self.persist_directory = persist_directory
+        self.dedup_threshold = dedup_threshold
+        self.compact_dims = compact_dims
+        self.binary = binary
         self.embeddings = OllamaEmbeddings(model=embedding_model)
         # Using RecursiveCharacterTextSplitter for optimal semantic boundary detection
         self.text_splitter = RecursiveCharacterTextSplitter(
@@ -34,40 +53,154 @@ class ReviewIngestor:
         
         1. Loads reviews via ReviewDataLoader.
         2. Wraps review text in Document objects with relevant metadata.
-        3. Splits documents into manageable chunks.
-        4. Embeds and stores chunks in ChromaDB.
+        3. Collapses near-duplicate reviews into one canonical document (MinHash/LSH).
+        4. Splits documents into manageable chunks.
+        5. Writes chunk texts and metadata to the columnar ChunkStore.
+        6. Embeds and stores chunks in ChromaDB under the same chunk IDs.
         """
         loader = ReviewDataLoader(reviews_csv_path)
         reviews = loader.load_reviews()
+        print(f"Loaded {len(reviews)} reviews ({loader.invalid_time_count} unparseable timestamps).")
         
         documents = []
         for review in reviews:
             # Metadata injection is key for Phase 2 intelligent filtering.
             # We keep context in page_content and structured data in metadata.
-            doc = Document(
-                page_content=review.review_text,
-                metadata={
-                    "restaurant": review.restaurant,
-                    "reviewer": review.reviewer,
-                    "rating": review.rating,
-                    "time": review.time,
-                    "has_timestamp": review.has_timestamp
-                }
-            )
+            metadata = {
+                "restaurant": review.restaurant,
+                "reviewer": review.reviewer,
+                "rating": review.rating,
+                "time": review.time,
+                "has_timestamp": review.has_timestamp
+            }
+            # Numeric time fields enable date-range filters; Chroma rejects None values,
+            # so they are only set when the timestamp was parsed.
+            if review.has_timestamp:
+                metadata.update(timestamp=review.timestamp, year=review.year, month=review.month)
+            doc = Document(page_content=review.review_text, metadata=metadata)
             documents.append(doc)
         
+        if self.dedup_threshold is not None:
+            documents = self.deduplicate(documents)
+        
         chunks = self.text_splitter.split_documents(documents)
         print(f"Split {len(documents)} documents into {len(chunks)} chunks.")
         
-        # Initialize vector store and persist documents
-        vector_store = Chroma.from_documents(
-            documents=chunks,
-            embedding=self.embeddings,
-            persist_directory=self.persist_directory
-        )
+        # Stable IDs shared by the chunk store and ChromaDB, so vector hits can be
+        # resolved to text and metadata without going back through Chroma.
+        ids = [f"chunk-{i}" for i in range(len(chunks))]
+        ChunkStore.write(self.persist_directory, ids, chunks)
+        print(f"Wrote {len(chunks)} chunks to the columnar chunk store.")
+        
+        if self.compact_dims or self.binary:
+            vector_store = self._store_compact(ids, chunks)
+        else:
+            # Initialize vector store and persist documents
+            vector_store = Chroma.from_documents(
+                documents=chunks,
+                embedding=self.embeddings,
+                ids=ids,
+                persist_directory=self.persist_directory
+            )
         print(f"Ingested {len(chunks)} chunks into ChromaDB at {self.persist_directory}.")
+        self.report_storage(vector_store)
         return vector_store
 
+    def report_storage(self, vector_store: Chroma):
+        """
+        Prints bytes per vector and on-disk size of each stored representation,
+        so the effect of the compact options is visible.
+        """
+        compact_index = CompactIndex.open(self.persist_directory)
+        own_files = {ChunkStore.FILE_NAME, CompactIndex.CONFIG_FILE, CompactIndex.FULL_FILE, CompactIndex.BINARY_FILE}
+        chroma_bytes = sum(
+            os.path.getsize(os.path.join(folder, name))
+            for folder, _, names in os.walk(self.persist_directory)
+            for name in names
+            if not (folder == self.persist_directory and name in own_files)
+        )
+        sample = vector_store._collection.get(limit=1, include=["embeddings"])
+        chroma_dims = len(sample["embeddings"][0]) if len(sample["embeddings"]) else 0
+        
+        def megabytes(name):
+            return os.path.getsize(os.path.join(self.persist_directory, name)) / 1e6
+        
+        print(f"Storage: Chroma {chroma_dims}-dim vectors ({chroma_dims * 4} B/vector), "
+              f"{chroma_bytes / 1e6:.1f} MB on disk incl. documents and metadata.")
+        if compact_index is not None:
+            if compact_index.binary:
+                bits = compact_index.dims or compact_index.full_dims
+                print(f"Storage: binary codes {bits} bits ({compact_index.codes.shape[1]} B/vector), "
+                      f"{megabytes(CompactIndex.BINARY_FILE):.1f} MB on disk (held in RAM).")
+            print(f"Storage: full-precision rescoring vectors {compact_index.full_dims}-dim "
+                  f"({compact_index.full_dims * 4} B/vector), {megabytes(CompactIndex.FULL_FILE):.1f} MB on disk "
+                  f"(memory-mapped, only shortlisted rows are read).")
+
+    def _store_compact(self, ids: List[str], chunks: List[Document]) -> Chroma:
+        """
+        Embeds chunks once at full precision and persists the compact index. ChromaDB gets
+        only the truncated vectors, or a 1-dim placeholder in binary mode (where the Hamming
+        first pass runs outside Chroma), never the full-precision ones.
+        """
+        full_vectors = np.asarray(
+            self.embeddings.embed_documents([chunk.page_content for chunk in chunks]), dtype=np.float32
+        )
+        compact_index = CompactIndex.write(
+            self.persist_directory, full_vectors, dims=self.compact_dims, binary=self.binary
+        )
+        chroma_vectors = compact_index.chroma_vectors(full_vectors)
+        
+        vector_store = Chroma(
+            persist_directory=self.persist_directory,
+            embedding_function=compact_index.chroma_embeddings(self.embeddings)
+        )
+        for start in range(0, len(chunks), self.ADD_BATCH_SIZE):
+            batch = slice(start, start + self.ADD_BATCH_SIZE)
+            vector_store._collection.add(
+                ids=ids[batch],
+                embeddings=chroma_vectors[batch].tolist(),
+                documents=[chunk.page_content for chunk in chunks[batch]],
+                metadatas=[chunk.metadata for chunk in chunks[batch]],
+            )
+        return vector_store
+
+    def deduplicate(self, documents: List[Document]) -> List[Document]:
+        """
+        Keeps one canonical document per group of near-duplicate reviews with the same rating,
+        so the canonical rating holds for every review it stands for.
+        
+        The canonical (first) document records how many duplicates it absorbed and which
+        restaurants they came from, so the signal isn't lost: each other restaurant gets a
+        boolean flag that restaurant filters also match (see ChromaFilterBuilder). Reports
+        how many reviews and embeddings were saved.
+        """
+        detector = NearDuplicateDetector(threshold=self.dedup_threshold)
+        groups = detector.find_groups([doc.page_content for doc in documents])
+        
+        canonical, dropped = [], []
+        for group in groups:
+            by_rating = {}
+            for i in group:
+                by_rating.setdefault(documents[i].metadata["rating"], []).append(documents[i])
+            for doc, *duplicates in by_rating.values():
+                doc.metadata["duplicate_count"] = len(duplicates)
+                # Chroma metadata must be scalar, so the restaurant set is stored as a delimited
+                # string for display, plus one filterable flag per other restaurant.
+                restaurants = dict.fromkeys(d.metadata["restaurant"] for d in [doc] + duplicates)
+                doc.metadata["duplicate_restaurants"] = " | ".join(restaurants)
+                for restaurant in restaurants:
+                    if restaurant != doc.metadata["restaurant"]:
+                        doc.metadata[ChromaFilterBuilder.duplicate_restaurant_key(restaurant)] = True
+                canonical.append(doc)
+                dropped.extend(duplicates)
+        
+        saved_embeddings = len(self.text_splitter.split_documents(dropped)) if dropped else 0
+        print(f"Deduplicated {len(documents)} reviews into {len(canonical)} "
+              f"(threshold={self.dedup_threshold}); saved {saved_embeddings} embeddings.")
+        return canonical
+
 if __name__ == "__main__":
-    ingestor = ReviewIngestor(persist_directory="data/chroma_db")
-    ingestor.ingest("data/raw/Restaurant reviews.csv")
+    from src.data_eng.snapshots import IndexSnapshotManager
+    # Build into a fresh snapshot version and publish it once validated
+    snapshots = IndexSnapshotManager("data/chroma_db")
+    snapshots.build(lambda path: ReviewIngestor(persist_directory=path).ingest("data/raw/Restaurant reviews.csv"))
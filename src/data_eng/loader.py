@@ -15,6 +15,10 @@ class ReviewModel(BaseModel):
     metadata: str = Field(alias="Metadata")
     time: str = Field(alias="Time")
     pictures: int = Field(alias="Pictures")
+    # Parsed from `time` by ReviewDataLoader; None when the raw value is missing or malformed.
+    timestamp: Optional[int] = None
+    year: Optional[int] = None
+    month: Optional[int] = None
     has_timestamp: bool = False
 
     @validator("rating", pre=True)
@@ -43,19 +47,41 @@ class ReviewModel(BaseModel):
     @validator("has_timestamp", always=True)
     def check_timestamp(cls, v, values):
         """
-        Determines if a valid timestamp exists based on the 'time' field.
+        Determines if a valid timestamp exists, i.e. the 'time' field was parsed successfully.
         """
-        time_val = values.get("time")
-        if not time_val or str(time_val).lower() in ['nan', 'none', '']:
-            return False
-        return True
+        return values.get("timestamp") is not None
 
 class ReviewDataLoader:
     """
     Handles loading of review data from CSV files and conversion to validated models.
     """
+    # Format of the raw 'Time' column, e.g. "5/25/2019 15:54"
+    TIME_FORMAT = "%m/%d/%Y %H:%M"
+
     def __init__(self, file_path: str):
         self.file_path = file_path
+        self.invalid_time_count = 0
+
+    @staticmethod
+    def _nullable_int(series: pd.Series) -> pd.Series:
+        """
+        Casts a numeric series to Python ints, with None where values are missing.
+        """
+        return series.astype("Int64").astype(object).where(series.notna(), None)
+
+    def parse_times(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Parses the raw 'Time' column into epoch seconds, year and month in one vectorized pass.
+        Non-empty values that fail to parse are counted in `invalid_time_count`.
+        """
+        parsed = pd.to_datetime(df["Time"], format=self.TIME_FORMAT, errors="coerce")
+        self.invalid_time_count = int((parsed.isna() & df["Time"].notna()).sum())
+        
+        epoch = (parsed - pd.Timestamp("1970-01-01")) // pd.Timedelta(seconds=1)
+        df["timestamp"] = self._nullable_int(epoch)
+        df["year"] = self._nullable_int(parsed.dt.year)
+        df["month"] = self._nullable_int(parsed.dt.month)
+        return df
 
     def load_reviews(self) -> List[ReviewModel]:
         """
@@ -67,6 +93,7 @@ class ReviewDataLoader:
         
         # Using latin-1 encoding as reviews often contain special characters (emojis, symbols)
         df = pd.read_csv(self.file_path, encoding='latin-1')
+        df = self.parse_times(df)
         
         reviews = []
         for _, row in df.iterrows():
@@ -87,6 +114,6 @@ if __name__ == "__main__":
     # Test the loader
     loader = ReviewDataLoader("data/raw/Restaurant reviews.csv")
     reviews = loader.load_reviews()
-    print(f"Loaded {len(reviews)} reviews.")
+    print(f"Loaded {len(reviews)} reviews ({loader.invalid_time_count} unparseable timestamps).")
     if reviews:
         print(f"First review: {reviews[0].review_text[:100]}...")
@@ -0,0 +1,220 @@
+import json
+import os
+import shutil
+import tempfile
+from datetime import datetime
+from typing import Callable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from filelock import FileLock
+from langchain_chroma import Chroma
+from src.data_eng.chunk_store import ChunkStore
+from src.retrieval.compact_index import CompactIndex
+from src.utils.ollama_helpers import OllamaProvider
+
+class IndexSnapshotManager:
+    """
+    Manages versioned index snapshots under a single root directory.
+
+    Each ingest builds a complete ChromaDB + ChunkStore into its own `versions/<version>` folder.
+    Readers resolve the published version through a small manifest (CURRENT.json) that is
+    replaced atomically, so a running app never sees a half-written index. Previously
+    published versions are kept for rollback.
+    """
+    MANIFEST = "CURRENT.json"
+    # Guards manifest updates across processes (e.g. a CLI ingest and the dashboard's rollback)
+    MANIFEST_LOCK = ".CURRENT.json.lock"
+    VERSIONS_DIR = "versions"
+    # Written into a version folder once it has been built and validated
+    COMPLETE_MARKER = ".complete"
+    DEFAULT_SAMPLE_QUERIES = ("How is the food?", "Was the service slow?")
+
+    def __init__(self, root: str = "data/chroma_db", keep: int = 3):
+        """
+        Args:
+            root: Folder holding the manifest and all snapshot versions.
+            keep: Number of previously published versions retained for rollback.
+        """
+        self.root = root
+        self.keep = keep
+        self._lock = FileLock(os.path.join(root, self.MANIFEST_LOCK))
+
+    # --- Reading ---
+
+    def _read_manifest(self) -> dict:
+        path = os.path.join(self.root, self.MANIFEST)
+        if not os.path.exists(path):
+            return {"current": None, "history": []}
+        with open(path, "r") as f:
+            return json.load(f)
+
+    def current_version(self) -> Optional[str]:
+        """
+        Returns the published version name, or None if nothing has been published.
+        """
+        return self._read_manifest()["current"]
+
+    def path_for(self, version: str) -> str:
+        return os.path.join(self.root, self.VERSIONS_DIR, version)
+
+    def current_path(self) -> Optional[str]:
+        """
+        Returns the directory of the published snapshot.
+        Falls back to the root itself for indexes ingested before snapshots existed.
+        """
+        version = self.current_version()
+        if version is not None:
+            return self.path_for(version)
+        if os.path.exists(os.path.join(self.root, "chroma.sqlite3")):
+            return self.root
+        return None
+
+    def is_complete(self, version: str) -> bool:
+        """
+        Whether a version finished building and passed validation.
+        """
+        return os.path.exists(os.path.join(self.path_for(version), self.COMPLETE_MARKER))
+
+    def list_versions(self) -> List[str]:
+        versions_dir = os.path.join(self.root, self.VERSIONS_DIR)
+        if not os.path.exists(versions_dir):
+            return []
+        return sorted(os.listdir(versions_dir))
+
+    @staticmethod
+    def open_index(path: str) -> Tuple[Chroma, Optional[ChunkStore], Optional[CompactIndex]]:
+        """
+        Opens the vector store, chunk store and (if present) compact index of a snapshot directory.
+        """
+        compact_index = CompactIndex.open(path)
+        embeddings = OllamaProvider.get_embeddings()
+        if compact_index is not None:
+            # Queries must be projected the same way as the vectors stored in Chroma
+            embeddings = compact_index.chroma_embeddings(embeddings)
+        vector_store = Chroma(
+            persist_directory=path,
+            embedding_function=embeddings
+        )
+        return vector_store, ChunkStore.open(path), compact_index
+
+    # --- Building & publishing ---
+
+    def build(self, build_fn: Callable[[str], None],
+              sample_queries: Sequence[str] = DEFAULT_SAMPLE_QUERIES) -> str:
+        """
+        Builds a new snapshot, validates it and publishes it.
+
+        Args:
+            build_fn: Callable that writes a complete index into the directory it is given
+                (e.g. `lambda path: ReviewIngestor(path).ingest(csv_path)`).
+            sample_queries: Queries that must return results for the snapshot to be published.
+
+        Returns:
+            The published version name.
+        """
+        version = datetime.now().strftime("v%Y%m%d-%H%M%S-%f")
+        path = self.path_for(version)
+        try:
+            build_fn(path)
+            self.validate(path, sample_queries)
+        except Exception:
+            # Never leave a broken version behind; the published one is untouched.
+            shutil.rmtree(path, ignore_errors=True)
+            raise
+        # Mark the version as finished so concurrent builds (in any process) may prune it later.
+        with open(os.path.join(path, self.COMPLETE_MARKER), "w") as f:
+            f.write(datetime.now().isoformat())
+        self.publish(version)
+        self.prune()
+        return version
+
+    def validate(self, path: str, sample_queries: Sequence[str] = DEFAULT_SAMPLE_QUERIES) -> None:
+        """
+        Checks a built snapshot before publishing: non-empty, vector and chunk store counts
+        agree, and every sample query returns hits that resolve in the chunk store.
+        Raises ValueError describing the first failed check.
+        """
+        vector_store, chunk_store, compact_index = self.open_index(path)
+        vector_count = vector_store._collection.count()
+        if vector_count == 0:
+            raise ValueError(f"Snapshot at {path} is empty.")
+        if chunk_store is None or len(chunk_store) != vector_count:
+            chunk_count = 0 if chunk_store is None else len(chunk_store)
+            raise ValueError(f"Snapshot at {path} has {vector_count} vectors but {chunk_count} chunks.")
+
+        if compact_index is not None and len(compact_index.full) != vector_count:
+            raise ValueError(f"Snapshot at {path} has {vector_count} vectors but "
+                             f"{len(compact_index.full)} full-precision rows.")
+
+        for query in sample_queries:
+            if compact_index is not None and compact_index.binary:
+                # Binary snapshots are searched outside Chroma
+                query_vector = np.asarray(vector_store.embeddings.base.embed_query(query), dtype=np.float32)
+                documents = chunk_store.get_documents_at(compact_index.hamming_search(query_vector, 1))
+            else:
+                result = vector_store._collection.query(
+                    query_embeddings=[vector_store.embeddings.embed_query(query)],
+                    n_results=1,
+                    include=["distances"],
+                )
+                documents = chunk_store.get_documents(result["ids"][0])
+            if not documents:
+                raise ValueError(f"Sample query {query!r} returned no results from {path}.")
+
+    def publish(self, version: str) -> None:
+        """
+        Atomically points readers at `version`, remembering the previous one for rollback.
+        """
+        with self._manifest_lock():
+            manifest = self._read_manifest()
+            history = manifest["history"]
+            if manifest["current"] is not None:
+                history = [manifest["current"]] + history
+            self._write_manifest({"current": version, "history": history[:self.keep]})
+
+    def rollback(self) -> str:
+        """
+        Re-publishes the previous snapshot. Returns the version now active.
+        """
+        with self._manifest_lock():
+            manifest = self._read_manifest()
+            if not manifest["history"]:
+                raise ValueError("No previous snapshot to roll back to.")
+            previous, history = manifest["history"][0], manifest["history"][1:]
+            self._write_manifest({"current": previous, "history": history})
+            return previous
+
+    def prune(self) -> None:
+        """
+        Deletes completed versions that are neither current nor kept for rollback.
+        Versions without the completion marker are builds still in progress, possibly in
+        another process, and are left alone (a build that crashed hard must be removed by hand).
+        Failures are ignored (e.g. a reader still holds files open on Windows).
+        """
+        # Held while deleting, so a version published meanwhile by another process isn't removed.
+        with self._manifest_lock():
+            manifest = self._read_manifest()
+            live = {manifest["current"], *manifest["history"]}
+            for version in self.list_versions():
+                if version not in live and self.is_complete(version):
+                    shutil.rmtree(self.path_for(version), ignore_errors=True)
+
+    def _manifest_lock(self) -> FileLock:
+        os.makedirs(self.root, exist_ok=True)
+        return self._lock
+
+    def _write_manifest(self, manifest: dict) -> None:
+        # Write-then-rename is atomic on both POSIX and Windows, so readers
+        # always see either the old or the new manifest, never a partial one.
+        # The temp file is unique, so concurrent writers never share it.
+        fd, tmp_path = tempfile.mkstemp(dir=self.root, prefix=f".{self.MANIFEST}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(manifest, f, indent=2)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, os.path.join(self.root, self.MANIFEST))
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
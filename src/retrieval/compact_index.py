@@ -0,0 +1,214 @@
+import json
+import os
+from typing import Any, List, Optional
+
+import numpy as np
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.retrievers import BaseRetriever
+
+# Number of set bits for every byte value, used for vectorized Hamming distances.
+_POPCOUNT = np.unpackbits(np.arange(256, dtype=np.uint8)[:, None], axis=1).sum(axis=1).astype(np.uint16)
+
+class TruncatedEmbeddings(Embeddings):
+    """
+    Wraps an embedding model and keeps only the first `dims` dimensions (Matryoshka truncation),
+    re-normalized to unit length. Used as the Chroma embedding function for compact snapshots
+    so that queries match the truncated vectors stored in the index.
+    """
+    def __init__(self, base: Embeddings, dims: int):
+        self.base = base
+        self.dims = dims
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        vectors = np.asarray(self.base.embed_documents(texts), dtype=np.float32)
+        return CompactIndex.truncate(vectors, self.dims).tolist()
+
+    def embed_query(self, text: str) -> List[float]:
+        vector = np.asarray(self.base.embed_query(text), dtype=np.float32)
+        return CompactIndex.truncate(vector, self.dims).tolist()
+
+class PlaceholderEmbeddings(Embeddings):
+    """
+    Chroma embedding function for binary snapshots. The Hamming first pass runs in NumPy, so
+    Chroma only keeps documents and metadata plus a constant 1-dim vector per chunk instead of
+    a full-precision HNSW index. `base` still exposes the real model for query embedding.
+    """
+    def __init__(self, base: Embeddings):
+        self.base = base
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [[0.0] for _ in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return [0.0]
+
+class CompactIndex:
+    """
+    Compact first-pass representations of the chunk embeddings, plus the full-precision
+    vectors kept on disk (memory-mapped) for rescoring the shortlist.
+
+    - Truncated: ChromaDB stores only the first `dims` dimensions, shrinking the HNSW index.
+    - Binary: one bit per dimension (sign), searched by Hamming distance in NumPy; ChromaDB
+      then only holds a 1-dim placeholder vector per chunk.
+    Rows line up with the ChunkStore, so row i is chunk i.
+    """
+    CONFIG_FILE = "compact_index.json"
+    FULL_FILE = "embeddings_full.npy"
+    BINARY_FILE = "embeddings_binary.npy"
+
+    def __init__(self, directory: str, config: dict):
+        self.full_dims = config["full_dims"]
+        self.dims = config.get("dims")
+        self.binary = config.get("binary", False)
+        # Full-precision vectors stay on disk; only shortlisted rows are paged in.
+        self.full = np.load(os.path.join(directory, self.FULL_FILE), mmap_mode="r")
+        self.codes = np.load(os.path.join(directory, self.BINARY_FILE)) if self.binary else None
+
+    @staticmethod
+    def normalize(vectors: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+        return vectors / np.maximum(norms, 1e-12)
+
+    @staticmethod
+    def truncate(vectors: np.ndarray, dims: Optional[int]) -> np.ndarray:
+        """
+        Keeps the first `dims` dimensions and re-normalizes. No-op when dims is None.
+        """
+        if dims is None:
+            return CompactIndex.normalize(vectors)
+        return CompactIndex.normalize(vectors[..., :dims])
+
+    @staticmethod
+    def quantize(vectors: np.ndarray) -> np.ndarray:
+        """
+        Binary quantization: one bit per dimension (positive or not), packed 8 per byte.
+        """
+        return np.packbits(vectors > 0, axis=-1)
+
+    @classmethod
+    def write(cls, directory: str, full_vectors: np.ndarray, dims: Optional[int] = None,
+              binary: bool = False) -> "CompactIndex":
+        """
+        Persists full-precision vectors and the requested compact representations.
+
+        Args:
+            directory: Snapshot directory (same folder as the ChunkStore).
+            full_vectors: (n_chunks, full_dims) embeddings in ChunkStore row order.
+            dims: Matryoshka truncation size for the first pass (e.g. 256 or 512), or None.
+            binary: Whether to also store binary-quantized codes for Hamming search.
+        """
+        full_vectors = cls.normalize(np.asarray(full_vectors, dtype=np.float32))
+        os.makedirs(directory, exist_ok=True)
+        np.save(os.path.join(directory, cls.FULL_FILE), full_vectors)
+        if binary:
+            np.save(os.path.join(directory, cls.BINARY_FILE), cls.quantize(cls.truncate(full_vectors, dims)))
+
+        config = {"full_dims": int(full_vectors.shape[1]), "dims": dims, "binary": binary}
+        with open(os.path.join(directory, cls.CONFIG_FILE), "w") as f:
+            json.dump(config, f, indent=2)
+        return cls(directory, config)
+
+    @classmethod
+    def open(cls, directory: str) -> Optional["CompactIndex"]:
+        """
+        Loads the compact index of a snapshot, or None if it was ingested at full precision only.
+        """
+        path = os.path.join(directory, cls.CONFIG_FILE)
+        if not os.path.exists(path):
+            return None
+        with open(path, "r") as f:
+            return cls(directory, json.load(f))
+
+    def first_pass(self, full_vectors: np.ndarray) -> np.ndarray:
+        """
+        Projects full-precision vectors to the (truncated) first-pass representation.
+        """
+        return self.truncate(full_vectors, self.dims)
+
+    def chroma_vectors(self, full_vectors: np.ndarray) -> np.ndarray:
+        """
+        Vectors to store in ChromaDB: placeholders in binary mode, otherwise the truncated first pass.
+        """
+        if self.binary:
+            return np.zeros((len(full_vectors), 1), dtype=np.float32)
+        return self.first_pass(full_vectors)
+
+    def chroma_embeddings(self, base: Embeddings) -> Embeddings:
+        """
+        Wraps the embedding model so Chroma queries match the vectors stored by `chroma_vectors`.
+        """
+        if self.binary:
+            return PlaceholderEmbeddings(base)
+        if self.dims:
+            return TruncatedEmbeddings(base, self.dims)
+        return base
+
+    def hamming_search(self, full_query: np.ndarray, n: int, rows: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Returns up to `n` row positions with the smallest Hamming distance to the query code.
+
+        Args:
+            full_query: Full-precision query embedding.
+            n: Shortlist size.
+            rows: Optional candidate row positions (e.g. from a metadata filter).
+        """
+        code = self.quantize(self.first_pass(full_query))
+        codes = self.codes if rows is None else self.codes[rows]
+        distances = _POPCOUNT[np.bitwise_xor(codes, code)].sum(axis=1)
+        n = min(n, len(distances))
+        if n == 0:
+            return np.empty(0, dtype=np.int64)
+        best = np.argpartition(distances, n - 1)[:n]
+        best = best[np.argsort(distances[best], kind="stable")]
+        return best if rows is None else rows[best]
+
+    def rescore(self, full_query: np.ndarray, rows: np.ndarray, k: int) -> np.ndarray:
+        """
+        Re-ranks shortlisted rows by full-precision cosine similarity and returns the top `k`.
+        """
+        if len(rows) == 0:
+            return rows
+        rows = np.unique(rows)  # sorted, so memory-mapped reads stay sequential
+        query = self.normalize(np.asarray(full_query, dtype=np.float32))
+        scores = np.asarray(self.full[rows]) @ query
+        order = np.argsort(-scores, kind="stable")[:k]
+        return rows[order]
+
+class CompactVectorRetriever(BaseRetriever):
+    """
+    Two-stage vector retriever for compact snapshots: a cheap first pass over truncated
+    (via ChromaDB) or binary (Hamming, in NumPy) vectors builds a shortlist, which is then
+    rescored with the full-precision vectors. Texts and metadata come from the ChunkStore.
+    """
+    vector_store: Any
+    chunk_store: Any
+    compact_index: Any
+    k: int = 5
+    filter: Optional[dict] = None
+    rescore_factor: int = 4
+
+    def _get_relevant_documents(
+        self, query: str, *, run_manager: CallbackManagerForRetrieverRun
+    ) -> List[Document]:
+        embeddings = self.vector_store.embeddings
+        base = getattr(embeddings, "base", embeddings)
+        full_query = np.asarray(base.embed_query(query), dtype=np.float32)
+        shortlist = self.k * self.rescore_factor
+
+        if self.compact_index.binary:
+            # Filters are applied as a vectorized scan over the chunk store.
+            rows = self.chunk_store.positions_where(self.filter) if self.filter else None
+            candidates = self.compact_index.hamming_search(full_query, shortlist, rows)
+        else:
+            result = self.vector_store._collection.query(
+                query_embeddings=[self.compact_index.first_pass(full_query).tolist()],
+                n_results=shortlist,
+                where=self.filter,
+                include=["distances"],
+            )
+            candidates = self.chunk_store.positions(result["ids"][0])
+
+        top_rows = self.compact_index.rescore(full_query, candidates, self.k)
+        return self.chunk_store.get_documents_at(top_rows)
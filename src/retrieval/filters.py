@@ -1,11 +1,140 @@
+import operator
+from datetime import datetime, timedelta, timezone
 from typing import Any, Dict, List, Optional
 
 class ChromaFilterBuilder:
     """
     Utility to build ChromaDB metadata filter dictionaries.
-    Supports operators like $eq, $ne, $gt, $gte, $lt, $lte.
+    Supports operators like $eq, $ne, $gt, $gte, $lt, $lte, $in, $nin,
+    plus a "date_range" shorthand that is pushed down as a numeric timestamp filter.
+    
+    Filters usually come from the query translation LLM, so `build_filter` casts operands
+    to the stored metadata types and drops clauses ChromaDB would reject. ChromaDB, the
+    ChunkStore and `matches` therefore all receive the same well-typed filter.
     """
     
+    _COMPARATORS = {
+        "$eq": operator.eq,
+        "$ne": operator.ne,
+        "$gt": operator.gt,
+        "$gte": operator.ge,
+        "$lt": operator.lt,
+        "$lte": operator.le,
+        "$in": lambda value, operand: value in operand,
+        "$nin": lambda value, operand: value not in operand,
+    }
+    
+    # Stored types of non-string metadata fields; operands for them are cast before filtering
+    # (e.g. {"rating": {"$gte": "4"}} becomes {"rating": {"$gte": 4.0}}).
+    _FIELD_TYPES = {
+        "rating": float,
+        "year": int,
+        "month": int,
+        "timestamp": int,
+        "has_timestamp": bool,
+    }
+    _SCALAR_TYPES = (str, int, float, bool)
+    
+    # Near-duplicate reviews collapsed at ingestion keep a boolean flag per other restaurant
+    # they were posted at, e.g. {"duplicate_restaurant:Paradise": True}.
+    DUPLICATE_RESTAURANT_PREFIX = "duplicate_restaurant:"
+    
+    @staticmethod
+    def duplicate_restaurant_key(restaurant: str) -> str:
+        return f"{ChromaFilterBuilder.DUPLICATE_RESTAURANT_PREFIX}{restaurant}"
+    
+    @staticmethod
+    def _cast(key: str, operand: Any) -> Any:
+        """
+        Casts an operand (or each element of a list operand) to the field's stored type.
+        Raises TypeError or ValueError when that isn't possible.
+        """
+        if isinstance(operand, list):
+            return [ChromaFilterBuilder._cast(key, item) for item in operand]
+        field_type = ChromaFilterBuilder._FIELD_TYPES.get(key)
+        if field_type is None:
+            return operand
+        if field_type is bool:
+            if isinstance(operand, str) and operand.lower() in ("true", "false"):
+                return operand.lower() == "true"
+            if isinstance(operand, bool):
+                return operand
+        elif not isinstance(operand, (bool, dict)):
+            # e.g. "2019" -> 2019, "4" -> 4.0
+            return int(float(operand)) if field_type is int else float(operand)
+        raise TypeError(f"Cannot use {operand!r} as a {field_type.__name__} for {key!r}")
+    
+    @staticmethod
+    def _build_clauses(key: str, conditions: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        Turns one field's conditions ({"$gte": 4, "$lte": 5}) into single-operator clauses,
+        as ChromaDB requires. Returns [] if any operator or operand is invalid, so a malformed
+        condition is ignored rather than failing the whole query.
+        """
+        clauses = []
+        for op, operand in conditions.items():
+            if op not in ChromaFilterBuilder._COMPARATORS or operand is None:
+                return []
+            try:
+                operand = ChromaFilterBuilder._cast(key, operand)
+            except (TypeError, ValueError):
+                return []
+            
+            if op in ("$in", "$nin"):
+                valid = isinstance(operand, list) and len(operand) > 0 and all(
+                    isinstance(item, ChromaFilterBuilder._SCALAR_TYPES) for item in operand
+                )
+            elif op in ("$eq", "$ne"):
+                valid = isinstance(operand, ChromaFilterBuilder._SCALAR_TYPES)
+            else:
+                # Range operators only accept numbers in ChromaDB
+                valid = isinstance(operand, (int, float)) and not isinstance(operand, bool)
+            if not valid:
+                return []
+            clauses.append(ChromaFilterBuilder._expand_restaurant(key, op, operand))
+        return clauses
+    
+    @staticmethod
+    def _expand_restaurant(key: str, op: str, operand: Any) -> Dict[str, Any]:
+        """
+        Makes positive restaurant filters also match collapsed duplicates from that restaurant.
+        Negations ($ne, $nin) only look at the canonical review's own restaurant.
+        """
+        if key != "restaurant" or op not in ("$eq", "$in"):
+            return {key: {op: operand}}
+        restaurants = operand if op == "$in" else [operand]
+        return {"$or": [{key: {op: operand}}] + [
+            {ChromaFilterBuilder.duplicate_restaurant_key(name): {"$eq": True}} for name in restaurants
+        ]}
+    
+    @staticmethod
+    def _to_epoch(value: str) -> int:
+        """
+        Converts an ISO date (YYYY-MM-DD) to epoch seconds.
+        Review timestamps are stored as naive local times, so they are compared as if UTC.
+        """
+        date = datetime.strptime(value, "%Y-%m-%d").replace(tzinfo=timezone.utc)
+        return int(date.timestamp())
+    
+    @staticmethod
+    def build_date_range(date_range: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        Translates {"from": "2019-01-01", "to": "2019-03-31"} into timestamp bounds.
+        Both ends are inclusive dates; either may be omitted. Malformed dates are ignored.
+        """
+        clauses = []
+        try:
+            if date_range.get("from"):
+                start = ChromaFilterBuilder._to_epoch(date_range["from"])
+                clauses.append({"timestamp": {"$gte": start}})
+            if date_range.get("to"):
+                # Inclusive end date: everything before the start of the following day.
+                end = ChromaFilterBuilder._to_epoch(date_range["to"]) + int(timedelta(days=1).total_seconds())
+                clauses.append({"timestamp": {"$lt": end}})
+        except (TypeError, ValueError):
+            return []
+        return clauses
+    
     @staticmethod
     def build_filter(filters: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """
@@ -22,18 +151,23 @@ class ChromaFilterBuilder:
             
         filter_list = []
         for key, value in filters.items():
-            if value is None:
+            if value is None or key.startswith("$"):
                 continue
                 
-            if isinstance(value, dict):
+            if key == "date_range":
+                # Handle date shorthand: {"date_range": {"from": "2019-01-01", "to": "2019-03-31"}}
+                # Anything else (e.g. a bare "2019") is dropped like a malformed date.
+                if isinstance(value, dict):
+                    filter_list.extend(ChromaFilterBuilder.build_date_range(value))
+            elif isinstance(value, dict):
                 # Handle operator-based filters: {"rating": {"$gte": 4}}
-                # Ensure the operator value itself isn't None
-                if any(v is None for v in value.values()):
-                    continue
-                filter_list.append({key: value})
+                filter_list.extend(ChromaFilterBuilder._build_clauses(key, value))
+            elif isinstance(value, list):
+                # Handle lists as membership: {"restaurant": ["A", "B"]}
+                filter_list.extend(ChromaFilterBuilder._build_clauses(key, {"$in": value}))
             else:
                 # Handle equality filters: {"restaurant": "Beyond Flavours"}
-                filter_list.append({key: {"$eq": value}})
+                filter_list.extend(ChromaFilterBuilder._build_clauses(key, {"$eq": value}))
         
         if len(filter_list) == 0:
             return None
@@ -42,9 +176,45 @@ class ChromaFilterBuilder:
             return filter_list[0]
         
         return {"$and": filter_list}
+    
+    @staticmethod
+    def matches(metadata: Dict[str, Any], where: Optional[Dict[str, Any]]) -> bool:
+        """
+        Evaluates a built ChromaDB filter against one document's metadata in memory,
+        with Chroma's semantics (a missing key never matches).
+        Used to filter already-retrieved candidates without another database round-trip.
+        """
+        if not where:
+            return True
+        for key, value in where.items():
+            if key == "$and":
+                if not all(ChromaFilterBuilder.matches(metadata, clause) for clause in value):
+                    return False
+            elif key == "$or":
+                if not any(ChromaFilterBuilder.matches(metadata, clause) for clause in value):
+                    return False
+            else:
+                if key not in metadata:
+                    return False
+                conditions = value if isinstance(value, dict) else {"$eq": value}
+                for op, operand in conditions.items():
+                    if op not in ChromaFilterBuilder._COMPARATORS:
+                        raise ValueError(f"Unsupported filter operator: {op}")
+                    try:
+                        if not ChromaFilterBuilder._COMPARATORS[op](metadata[key], operand):
+                            return False
+                    except TypeError:
+                        # e.g. comparing a string field with a number
+                        return False
+        return True
 
 if __name__ == "__main__":
     # Test cases
     builder = ChromaFilterBuilder()
     print(builder.build_filter({"restaurant": "Beyond Flavours"}))
     print(builder.build_filter({"restaurant": "Beyond Flavours", "rating": {"$gte": 4}}))
+    print(builder.build_filter({"date_range": {"from": "2019-01-01", "to": "2019-03-31"}}))
+    print(builder.build_filter({"rating": {"$gte": "4", "$lte": 5}}))
+    print(builder.build_filter({"year": "2019", "month": {"$in": ["1", "2"]}, "has_timestamp": "true"}))
+    print(builder.matches({"restaurant": "Beyond Flavours", "rating": 5.0},
+                          builder.build_filter({"restaurant": "Beyond Flavours", "rating": {"$gte": 4}})))
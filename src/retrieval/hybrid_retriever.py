@@ -1,35 +1,79 @@
-from typing import List
+from typing import Any, List, Optional
 from langchain_community.retrievers import BM25Retriever
 from langchain.retrievers import EnsembleRetriever
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
 from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+from src.retrieval.compact_index import CompactVectorRetriever
+
+class ChunkStoreVectorRetriever(BaseRetriever):
+    """
+    Vector retriever that uses ChromaDB only for similarity search (IDs + distances)
+    and resolves texts and metadata from the columnar ChunkStore.
+    """
+    vector_store: Any
+    chunk_store: Any
+    k: int = 5
+    filter: Optional[dict] = None
+
+    def _get_relevant_documents(
+        self, query: str, *, run_manager: CallbackManagerForRetrieverRun
+    ) -> List[Document]:
+        query_embedding = self.vector_store.embeddings.embed_query(query)
+        result = self.vector_store._collection.query(
+            query_embeddings=[query_embedding],
+            n_results=self.k,
+            where=self.filter,
+            include=["distances"],
+        )
+        return self.chunk_store.get_documents(result["ids"][0])
 
 class HybridRetrieverFactory:
     """
     Factory class to create a Hybrid Retriever combining Vector search and BM25.
     """
-    
+
     @staticmethod
-    def create_hybrid_retriever(vector_store, info_filters: dict = None, k: int = 5) -> EnsembleRetriever:
+    def create_hybrid_retriever(vector_store, info_filters: dict = None, k: int = 5, chunk_store=None,
+                                compact_index=None) -> EnsembleRetriever:
         """
         Initializes a BM25 retriever from a filtered subset of documents and
         combines it with the vector store's filtered retriever.
+
+        When a ChunkStore is given, the BM25 corpus is built from a vectorized scan of the
+        store and vector hits are hydrated from it, instead of pulling lists of dicts out of Chroma.
+        With a CompactIndex as well, vector search runs as a compact first pass plus full-precision rescoring.
         """
-        if info_filters:
-            filtered_data = vector_store.get(where=info_filters)
+        # 1. Collect the (filtered) BM25 corpus
+        if chunk_store is not None:
+            documents = chunk_store.documents(where=info_filters)
         else:
-            filtered_data = vector_store.get()
-        
-        documents = [
-            Document(page_content=text, metadata=meta) 
-            for text, meta in zip(filtered_data['documents'], filtered_data['metadatas'])
-        ]
-        
+            if info_filters:
+                filtered_data = vector_store.get(where=info_filters)
+            else:
+                filtered_data = vector_store.get()
+
+            documents = [
+                Document(page_content=text, metadata=meta)
+                for text, meta in zip(filtered_data['documents'], filtered_data['metadatas'])
+            ]
+
         # 2. Initialize Vector Retriever with filters
-        search_kwargs = {"k": k}
-        if info_filters:
-            search_kwargs["filter"] = info_filters
-            
-        vector_retriever = vector_store.as_retriever(search_kwargs=search_kwargs)
+        if chunk_store is not None and compact_index is not None:
+            vector_retriever = CompactVectorRetriever(
+                vector_store=vector_store, chunk_store=chunk_store, compact_index=compact_index,
+                k=k, filter=info_filters
+            )
+        elif chunk_store is not None:
+            vector_retriever = ChunkStoreVectorRetriever(
+                vector_store=vector_store, chunk_store=chunk_store, k=k, filter=info_filters
+            )
+        else:
+            search_kwargs = {"k": k}
+            if info_filters:
+                search_kwargs["filter"] = info_filters
+
+            vector_retriever = vector_store.as_retriever(search_kwargs=search_kwargs)
 
         if not documents:
             return vector_retriever
@@ -37,11 +81,11 @@ class HybridRetrieverFactory:
         # 3. Initialize BM25 Retriever
         bm25_retriever = BM25Retriever.from_documents(documents)
         bm25_retriever.k = k
-        
+
         # 4. Combine into Ensemble Retriever
         ensemble_retriever = EnsembleRetriever(
             retrievers=[bm25_retriever, vector_retriever],
             weights=[0.5, 0.5]
         )
-        
+
         return ensemble_retriever
@@ -0,0 +1,53 @@
+import math
+from typing import List, Optional
+import pyarrow.compute as pc
+from langchain_core.documents import Document
+
+class RecencyScorer:
+    """
+    Re-orders reranked documents by blending relevance with an exponential recency decay.
+    """
+
+    @staticmethod
+    def reference_timestamp(chunk_store=None, docs: Optional[List[Document]] = None) -> Optional[int]:
+        """
+        Returns the timestamp that counts as "now": the newest review in the corpus
+        if a ChunkStore is available, otherwise the newest among the given documents.
+        The review dump is historical, so wall-clock time would make every review look equally old.
+        """
+        if chunk_store is not None and "timestamp" in chunk_store.table.column_names:
+            return pc.max(chunk_store.table["timestamp"]).as_py()
+        timestamps = [doc.metadata["timestamp"] for doc in docs or [] if "timestamp" in doc.metadata]
+        return max(timestamps) if timestamps else None
+
+    @staticmethod
+    def rerank(docs: List[Document], weight: float, half_life_days: float = 180,
+               reference_ts: Optional[int] = None) -> List[Document]:
+        """
+        Sorts documents by (1 - weight) * relevance + weight * recency.
+
+        Args:
+            docs: Documents, ideally carrying FlashRank's "relevance_score" in metadata.
+            weight: Share of the final score given to recency (0 disables re-ordering).
+            half_life_days: Age at which a review's recency score halves.
+            reference_ts: Epoch seconds treated as "now"; defaults to the newest document.
+        """
+        if weight <= 0 or not docs:
+            return docs
+        if reference_ts is None:
+            reference_ts = RecencyScorer.reference_timestamp(docs=docs)
+        if reference_ts is None:
+            return docs
+
+        half_life = half_life_days * 86400
+        scored = []
+        for rank, doc in enumerate(docs):
+            # Fall back to rank-based relevance when the reranker didn't attach a score.
+            relevance = doc.metadata.get("relevance_score", 1.0 - rank / len(docs))
+            timestamp = doc.metadata.get("timestamp")
+            # Undated reviews get no recency credit rather than being dropped.
+            recency = 0.0 if timestamp is None else math.pow(0.5, max(reference_ts - timestamp, 0) / half_life)
+            doc.metadata["recency_score"] = recency
+            scored.append(((1 - weight) * float(relevance) + weight * recency, doc))
+
+        return [doc for _, doc in sorted(scored, key=lambda item: item[0], reverse=True)]